@@ -17,3 +17,16 @@ class CustomAccountAdapter(DefaultAccountAdapter):
         # Default behavior - redirect to home
         return super().get_login_redirect_url(request)
 
+    def save_user(self, request, user, form, commit=True):
+        """
+        Fill in the name fields before the user is first saved, so signup
+        is a single INSERT rather than an INSERT plus an UPDATE.
+        """
+        user = super().save_user(request, user, form, commit=False)
+        user.first_name = form.cleaned_data.get("first_name", "").strip()
+        user.last_name = form.cleaned_data.get("last_name", "").strip()
+        # Store name as combination of first and last
+        user.name = f"{user.first_name} {user.last_name}".strip()
+        if commit:
+            user.save()
+        return user
@@ -1,6 +1,18 @@
+import atexit
+import logging
+import logging.handlers
+
 from django.apps import AppConfig
 
 
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        # Drain the QueueHandler set up in LOGGING on a background thread
+        for handler in logging.getLogger('accounts.backends').handlers:
+            if isinstance(handler, logging.handlers.QueueHandler):
+                listener = logging.handlers.QueueListener(handler.queue, logging.StreamHandler())
+                listener.start()
+                atexit.register(listener.stop)
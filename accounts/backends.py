@@ -1,11 +1,39 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.db.models.functions import Lower
+import functools
+import hmac
 import logging
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
+@functools.lru_cache(maxsize=None)
+def _dummy_hash():
+    """
+    Hash checked against when no user matches, so a miss costs the same
+    hasher round as a wrong password for an existing user. Built on first
+    use rather than at import, since hashing is deliberately slow.
+    """
+    return make_password('x')
+
+
+def const_eq(a, b):
+    """
+    Constant-time equality for secrets.
+    Compare tokens, signatures, invite codes and similar values with this
+    rather than ==, which returns early at the first differing character
+    and leaks how much of the value matched.
+    """
+    if isinstance(a, str):
+        a = a.encode('utf-8')
+    if isinstance(b, str):
+        b = b.encode('utf-8')
+    return hmac.compare_digest(a, b)
+
+
 class EmailBackend(ModelBackend):
     """
     Custom authentication backend that uses email instead of username.
@@ -13,7 +41,7 @@ class EmailBackend(ModelBackend):
     but our User model uses email as USERNAME_FIELD.
     """
     def authenticate(self, request, username=None, password=None, **kwargs):
-        logger.info(f"EmailBackend.authenticate called with username={username}, password={'*' * len(password) if password else None}")
+        logger.info("EmailBackend.authenticate called with username=%s", username)
         
         if username is None:
             username = kwargs.get(User.USERNAME_FIELD)
@@ -22,26 +50,36 @@ class EmailBackend(ModelBackend):
             logger.warning("EmailBackend: username or password is None")
             return None
         
-        try:
-            # Get user by email (since USERNAME_FIELD is 'email')
-            user = User.objects.get(email=username)
-            logger.info(f"EmailBackend: Found user {user.email}")
-        except User.DoesNotExist:
-            logger.warning(f"EmailBackend: User with email {username} does not exist")
-            # Run the default password hasher once to reduce the timing
-            # difference between an existing and a non-existing user
-            User().set_password(password)
+        # Get user by email (since USERNAME_FIELD is 'email'), case-insensitively.
+        # Filtering on Lower('email') matches users_email_lower_uniq; iexact
+        # compiles to UPPER() on PostgreSQL and wouldn't use it.
+        user = (
+            User.objects.alias(email_lower=Lower('email'))
+            .filter(email_lower=username.lower())
+            .only('id', 'email', 'name', 'password', 'is_active')
+            .first()
+        )
+        if user is None:
+            logger.warning("EmailBackend: User with email %s does not exist", username)
+            # Run the password hasher once to reduce the timing difference
+            # between an existing and a non-existing user
+            get_hasher().verify(password, _dummy_hash())
             return None
+        logger.info("EmailBackend: Found user %s", user.email)
         
         # Check password and user permissions
         password_valid = user.check_password(password)
         can_authenticate = self.user_can_authenticate(user)
-        logger.info(f"EmailBackend: password_valid={password_valid}, can_authenticate={can_authenticate}, is_active={user.is_active}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "EmailBackend: password_valid=%s, can_authenticate=%s, is_active=%s",
+                password_valid, can_authenticate, user.is_active,
+            )
         
         if password_valid and can_authenticate:
-            logger.info(f"EmailBackend: Authentication successful for {user.email}")
+            logger.info("EmailBackend: Authentication successful for %s", user.email)
             return user
         
-        logger.warning(f"EmailBackend: Authentication failed for {user.email}")
+        logger.warning("EmailBackend: Authentication failed for %s", user.email)
         return None
 
@@ -19,30 +19,18 @@ class SignupForm(AllauthSignupForm):
         if not email:
             return email
             
-        try:
-            existing_user = User.objects.get(email=email)
-            
-            # If user exists but has no password set, they're an invited user
-            # Allow them to complete their signup
-            if not existing_user.has_usable_password():
-                return email
-                
-            # User exists and has a password - this is a legitimate duplicate
-            # Raise validation error to show "Account Already Exists"
-            raise forms.ValidationError(
-                "A user with this email address already exists."
-            )
-            
-        except User.DoesNotExist:
+        existing_user = User.objects.filter(email=email).only('id', 'password').first()
+        if existing_user is None:
             # No user exists with this email, allow signup
             return email
 
-    def save(self, request):
-        user = super().save(request)
-        user.first_name = self.cleaned_data.get("first_name", "").strip()
-        user.last_name = self.cleaned_data.get("last_name", "").strip()
-        # Store name as combination of first and last
-        user.name = f"{user.first_name} {user.last_name}".strip()
-        user.save(update_fields=["first_name", "last_name", "name"])
-        return user
+        # If user exists but has no password set, they're an invited user
+        # Allow them to complete their signup
+        if not existing_user.has_usable_password():
+            return email
 
+        # User exists and has a password - this is a legitimate duplicate
+        # Raise validation error to show "Account Already Exists"
+        raise forms.ValidationError(
+            "A user with this email address already exists."
+        )
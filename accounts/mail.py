@@ -0,0 +1,41 @@
+"""
+Email backend that sends mail off the request thread.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+logger = logging.getLogger(__name__)
+
+
+class ThreadedEmailBackend(BaseEmailBackend):
+    """
+    Hands messages to settings.THREADED_EMAIL_BACKEND on a background thread,
+    so allauth's signup and resend-confirmation views return without waiting
+    on the SMTP/API round-trip.
+    """
+    def __init__(self, fail_silently=False, **kwargs):
+        super().__init__(fail_silently=fail_silently)
+        # Passed on to the real backend (host, port, credentials, timeout...)
+        self.connection_kwargs = kwargs
+
+    def send_messages(self, email_messages):
+        messages = list(email_messages or [])
+        if not messages:
+            return 0
+        threading.Thread(target=self._send, args=(messages,)).start()
+        return len(messages)
+
+    def _send(self, messages):
+        try:
+            connection = get_connection(
+                settings.THREADED_EMAIL_BACKEND,
+                fail_silently=self.fail_silently,
+                **self.connection_kwargs,
+            )
+            connection.send_messages(messages)
+        except Exception:
+            logger.exception("ThreadedEmailBackend: failed to send %d message(s)", len(messages))
@@ -1,3 +1,43 @@
-from django.test import TestCase
+from allauth.account.models import EmailAddress
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils.cache import get_max_age
 
-# Create your tests here.
+User = get_user_model()
+
+# The site-wide page cache is only installed outside DEBUG and test runs, so
+# rebuild the production MIDDLEWARE here
+PAGE_CACHE_MIDDLEWARE = [
+    'django.middleware.cache.UpdateCacheMiddleware',
+    'api.middleware.NeverCachePrivate',
+    *settings.MIDDLEWARE,
+    'django.middleware.cache.FetchFromCacheMiddleware',
+]
+
+# The manifest storage needs collectstatic output, which tests don't have
+PLAIN_STORAGES = {
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+@override_settings(MIDDLEWARE=PAGE_CACHE_MIDDLEWARE, STORAGES=PLAIN_STORAGES)
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='cache@example.com', password='pw-12345-x')
+        EmailAddress.objects.create(user=self.user, email='cache@example.com', primary=True, verified=True)
+        self.client.force_login(self.user)
+
+    def test_logged_in_page_is_not_cached(self):
+        response = self.client.get('/accounts/email/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(get_max_age(response), (None, 0))
+        self.assertIn('private', response['Cache-Control'])
+
+        # A fresh request must see the new address rather than a cached page
+        EmailAddress.objects.create(user=self.user, email='second@example.com')
+        response = self.client.get('/accounts/email/')
+        self.assertContains(response, 'second@example.com')
@@ -1,5 +1,6 @@
 from django.shortcuts import render, redirect
 from django.contrib import messages
+from django.db.models import Q
 
 
 def signup_pending(request):
@@ -28,9 +29,12 @@ def resend_confirmation(request):
         return redirect('account_login')
     try:
         from allauth.account.models import EmailAddress
+        # Primary address if there is one, else the one matching user.email
         email_address = (
-            EmailAddress.objects.filter(user=request.user, primary=True).first()
-            or EmailAddress.objects.filter(user=request.user, email=getattr(request.user, 'email', '')).first()
+            EmailAddress.objects.filter(user=request.user)
+            .filter(Q(primary=True) | Q(email=getattr(request.user, 'email', '')))
+            .order_by('-primary')
+            .first()
         )
 
         if not email_address:
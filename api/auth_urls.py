@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+# Mounted under api/auth/ in argyle/urls.py
+urlpatterns = [
+    path('login', views.login, name='api-login'),
+    path('signup', views.signup, name='api-signup'),
+    path('logout', views.logout, name='api-logout'),
+    path('me', views.get_current_user, name='api-me'),
+]
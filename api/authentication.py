@@ -0,0 +1,75 @@
+"""
+DRF authentication for the JWT auth-token cookie issued by the login/signup views
+"""
+import os
+
+import jwt
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.authentication import BaseAuthentication
+
+User = get_user_model()
+
+AUTH_COOKIE = 'auth-token'
+
+# JWT signing config, resolved once at import. The secret is kept as bytes
+# so PyJWT doesn't re-encode it on every encode/decode.
+JWT_SECRET = (
+    os.environ.get('NEXTAUTH_SECRET') or os.environ.get('SECRET_KEY') or settings.SECRET_KEY
+).encode('utf-8')
+JWT_ALG = 'HS256'
+JWT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# How long an authenticated user's row is reused before re-reading it.
+# Saves and deletes drop the entry (see ApiConfig.ready), but QuerySet.update()
+# on users bypasses that and is only picked up once the entry expires. Only
+# enabled with a shared cache: on per-process LocMem the receiver would clear
+# just the current worker's copy.
+USER_CACHE_ENABLED = settings.SHARED_CACHE
+USER_CACHE_TIMEOUT = 60
+
+
+def _user_cache_key(user_id):
+    return f'auth_user:{user_id}'
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    """post_save/post_delete receiver for the User model"""
+    cache.delete(_user_cache_key(instance.pk))
+
+
+class JWTCookieAuthentication(BaseAuthentication):
+    """
+    Authenticates API requests from the auth-token cookie.
+    DRF runs this once per request and caches the result on request.user.
+    A missing or invalid token leaves the request anonymous instead of
+    failing it, so a stale cookie doesn't break public endpoints.
+    """
+    def authenticate(self, request):
+        token = request.COOKIES.get(AUTH_COOKIE)
+        if not token:
+            return None
+
+        try:
+            decoded = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
+            user_id = decoded['userId']
+        except (jwt.InvalidTokenError, KeyError):
+            return None
+
+        # /api/auth/me is hit on nearly every page load, so keep the row briefly
+        cache_key = _user_cache_key(user_id)
+        user = cache.get(cache_key) if USER_CACHE_ENABLED else None
+        if user is None:
+            try:
+                user = User.objects.only('id', 'email', 'name').get(id=user_id)
+            except User.DoesNotExist:
+                return None
+            if USER_CACHE_ENABLED:
+                cache.set(cache_key, user, USER_CACHE_TIMEOUT)
+
+        return (user, token)
+
+    def authenticate_header(self, request):
+        # Makes DRF answer unauthenticated requests with 401 rather than 403
+        return 'JWT realm="api"'
@@ -1,20 +1,21 @@
 """
-Custom middleware to exempt API endpoints from CSRF protection
+Custom middleware for API endpoints and per-user pages: cache control
 """
+from django.utils.cache import add_never_cache_headers
 from django.utils.deprecation import MiddlewareMixin
-from django.views.decorators.csrf import csrf_exempt
 
+API_PREFIX = '/api/'
 
-class DisableCSRFForAPI(MiddlewareMixin):
+
+class NeverCachePrivate(MiddlewareMixin):
     """
-    Middleware to disable CSRF for API endpoints.
-    This allows API endpoints to work without CSRF tokens while keeping
-    CSRF protection for admin and django-allauth forms.
+    Middleware to keep per-user responses out of the site-wide cache.
+    API responses depend on the auth-token cookie without varying on it, and
+    any page that read the session (which request.user does) is specific to
+    its visitor, so neither the cache middleware nor browsers may store them.
     """
-    def process_view(self, request, view_func, view_args, view_kwargs):
-        # Check if this is an API endpoint
-        if request.path.startswith('/api/'):
-            # Exempt API endpoints from CSRF
-            return csrf_exempt(view_func)(request, *view_args, **view_kwargs)
-        return None
-
+    def process_response(self, request, response):
+        session = getattr(request, 'session', None)
+        if request.path_info.startswith(API_PREFIX) or (session is not None and session.accessed):
+            add_never_cache_headers(response)
+        return response
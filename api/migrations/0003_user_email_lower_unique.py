@@ -0,0 +1,46 @@
+# Generated by Django 5.2.8 on 2026-10-15 22:07
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def lowercase_emails(apps, schema_editor):
+    """
+    Signup used to check only exact-case duplicates, so the table may hold
+    addresses that differ only by case. Those can't be merged automatically
+    (each owns its own songs and password), so stop and list them; otherwise
+    lowercase every address to match UserManager.create_user.
+    """
+    User = apps.get_model('api', 'User')
+    duplicates = list(
+        User.objects.annotate(email_lower=Lower('email'))
+        .values('email_lower')
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+        .values_list('email_lower', flat=True)
+    )
+    if duplicates:
+        raise RuntimeError(
+            'Cannot add users_email_lower_uniq: these emails belong to more '
+            'than one user when compared case-insensitively. Merge or rename '
+            'the accounts, then migrate again: ' + ', '.join(sorted(duplicates))
+        )
+    User.objects.exclude(email=Lower('email')).update(email=Lower('email'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_alter_user_managers_remove_user_username'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='users_email_lower_uniq'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 
 
@@ -6,7 +7,8 @@ class UserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError('The Email field must be set')
-        email = self.normalize_email(email)
+        # Lowercase the whole address to match the LOWER(email) constraint
+        email = self.normalize_email(email).lower()
         user = self.model(email=email, **extra_fields)
         user.set_password(password)
         user.save(using=self._db)
@@ -42,6 +44,10 @@ class User(AbstractUser):
     class Meta:
         db_table = 'users'
         ordering = ['-created_at']
+        constraints = [
+            # Case-insensitive uniqueness; also backs the LOWER(email) lookup at login
+            models.UniqueConstraint(Lower('email'), name='users_email_lower_uniq'),
+        ]
 
     def __str__(self):
         return self.email
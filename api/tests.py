@@ -1,3 +1,88 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .authentication import AUTH_COOKIE
+from .models import Song
+from .views import _encode_token
+
+User = get_user_model()
+
+
+class CurrentUserTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='me@example.com', password='pw-12345-x', name='Old')
+
+    def login(self, user=None):
+        self.client.cookies[AUTH_COOKIE] = _encode_token(user or self.user)
+
+    def test_no_cookie(self):
+        response = self.client.get('/api/auth/me')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data['error'], 'Not authenticated')
+
+    def test_invalid_cookie(self):
+        self.client.cookies[AUTH_COOKIE] = 'not-a-jwt'
+        response = self.client.get('/api/auth/me')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data['error'], 'Invalid token')
+
+    def test_valid_cookie(self):
+        self.login()
+        response = self.client.get('/api/auth/me')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user'], {'id': self.user.id, 'email': 'me@example.com', 'name': 'Old'})
+
+    @mock.patch('api.authentication.USER_CACHE_ENABLED', True)
+    def test_cached_user_invalidated_on_save_and_delete(self):
+        self.login()
+        self.client.get('/api/auth/me')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/auth/me')
+        self.assertEqual(response.data['user']['name'], 'Old')
+
+        self.user.name = 'New'
+        self.user.save()
+        response = self.client.get('/api/auth/me')
+        self.assertEqual(response.data['user']['name'], 'New')
+
+        self.user.delete()
+        response = self.client.get('/api/auth/me')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class SignupTests(APITestCase):
+    def test_duplicate_email_differing_in_case(self):
+        User.objects.create_user(email='dup@example.com', password='pw-12345-x')
+        response = self.client.post(
+            '/api/auth/signup', {'email': 'Dup@Example.com', 'password': 'pw-12345-x'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['error'], 'User with this email already exists')
+        self.assertEqual(User.objects.count(), 1)
+
+
+class SongTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(email='owner@example.com', password='pw-12345-x', name='Owner')
+        self.public = Song.objects.create(user=self.owner, title='Public', sequence='[]', is_public=True)
+        self.private = Song.objects.create(user=self.owner, title='Private', sequence='[]')
+
+    def test_anonymous_create_is_unauthorized(self):
+        response = self.client.post('/api/songs/', {'title': 'New', 'sequence': '[]'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(Song.objects.count(), 2)
+
+    def test_anonymous_retrieve_public_song(self):
+        response = self.client.get(f'/api/songs/{self.public.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], 'Public')
+        self.assertEqual(response.data['author_name'], 'Owner')
+
+    def test_anonymous_retrieve_private_song(self):
+        response = self.client.get(f'/api/songs/{self.private.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -1,24 +1,71 @@
 from rest_framework import viewsets, status
-from rest_framework.decorators import api_view, permission_classes, action
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, action
+from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly, AllowAny
+from django.core.cache import cache
 from django.contrib.auth import get_user_model
-from django.contrib.auth import authenticate
+from django.db import IntegrityError, transaction
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.middleware.csrf import get_token
 import jwt
-from datetime import datetime, timedelta
+from datetime import datetime
+import hashlib
+import json
 import os
+import time
 from openai import OpenAI
 
+from .authentication import AUTH_COOKIE, JWT_ALG, JWT_SECRET, JWT_TTL_SECONDS
 from .models import Song
 from .serializers import SongSerializer, UserSerializer
 
 User = get_user_model()
 
+# Columns SongSerializer reads, including the joined author
+SONG_FIELDS = (
+    'id', 'title', 'sequence', 'key_info', 'bpm', 'notes', 'is_public',
+    'created_at', 'updated_at', 'user__id', 'user__name', 'user__email',
+)
+
+OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+OPENAI_CACHE_TIMEOUT = 60 * 60
+_openai_client = None
+
+
+def _get_openai_client():
+    """Shared OpenAI client, so its HTTP connection pool is reused across requests"""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = OpenAI(api_key=OPENAI_API_KEY)
+    return _openai_client
+
+
+def _openai_cache_key(messages, model, max_tokens, temperature):
+    """Cache key for a chat completion request"""
+    payload = json.dumps(
+        [messages, model, max_tokens, temperature], sort_keys=True
+    ).encode('utf-8')
+    return 'openai_chat:' + hashlib.blake2b(payload, digest_size=32).hexdigest()
+
+
+def _encode_token(user):
+    """Create the auth-token JWT for a user"""
+    return jwt.encode(
+        {
+            'userId': user.id,
+            'email': user.email,
+            'name': user.name or '',
+            'exp': int(time.time()) + JWT_TTL_SECONDS
+        },
+        JWT_SECRET,
+        algorithm=JWT_ALG
+    )
+
 
 @api_view(['GET'])
+@authentication_classes([])
 @permission_classes([AllowAny])
 def health_check(request):
     """Health check endpoint"""
@@ -26,12 +73,13 @@ def health_check(request):
         'status': 'ok',
         'timestamp': datetime.now().isoformat(),
         'environment': os.environ.get('DJANGO_SETTINGS_MODULE', 'development'),
-        'openaiConfigured': bool(os.environ.get('OPENAI_API_KEY')),
+        'openaiConfigured': bool(OPENAI_API_KEY),
         'version': '1.0.0'
     })
 
 
 @api_view(['POST'])
+@authentication_classes([])
 @permission_classes([AllowAny])
 def openai_chat(request):
     """OpenAI chat endpoint"""
@@ -46,23 +94,29 @@ def openai_chat(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    api_key = os.environ.get('OPENAI_API_KEY')
-    if not api_key:
+    if not OPENAI_API_KEY:
         return Response(
             {'error': 'OpenAI API key not configured'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+    # Only temperature 0 is deterministic enough to replay a cached answer
+    cache_key = None
+    if temperature == 0:
+        cache_key = _openai_cache_key(messages, model, max_tokens, temperature)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return Response(cached)
+
     try:
-        client = OpenAI(api_key=api_key)
-        response = client.chat.completions.create(
+        response = _get_openai_client().chat.completions.create(
             model=model,
             messages=messages,
             max_tokens=max_tokens,
             temperature=temperature
         )
         
-        return Response({
+        payload = {
             'id': response.id,
             'object': response.object,
             'created': response.created,
@@ -80,7 +134,10 @@ def openai_chat(request):
                 'completion_tokens': response.usage.completion_tokens,
                 'total_tokens': response.usage.total_tokens
             }
-        })
+        }
+        if cache_key:
+            cache.set(cache_key, payload, OPENAI_CACHE_TIMEOUT)
+        return Response(payload)
     except Exception as e:
         return Response(
             {'error': f'OpenAI API error: {str(e)}'},
@@ -89,6 +146,7 @@ def openai_chat(request):
 
 
 @api_view(['POST'])
+@authentication_classes([])
 @permission_classes([AllowAny])
 def login(request):
     """User login endpoint"""
@@ -101,23 +159,16 @@ def login(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    # Use Django's authenticate function to use our custom backend
-    from django.contrib.auth import authenticate
-    user = authenticate(request, username=email, password=password)
+    # Go straight to our email backend rather than django.contrib.auth's
+    # authenticate(), which on a miss would also try ModelBackend and the
+    # allauth backend, each running its own password hash
+    from accounts.backends import EmailBackend
+    user = EmailBackend().authenticate(request, username=email, password=password)
     
     if user:
+        user.backend = 'accounts.backends.EmailBackend'
         # Create JWT token
-        secret = os.environ.get('NEXTAUTH_SECRET') or os.environ.get('SECRET_KEY') or 'django-insecure-change-me-in-production'
-        token = jwt.encode(
-            {
-                'userId': user.id,
-                'email': user.email,
-                'name': user.name or '',
-                'exp': int((datetime.utcnow() + timedelta(days=7)).timestamp())
-            },
-            secret,
-            algorithm='HS256'
-        )
+        token = _encode_token(user)
 
         response = Response({
             'success': True,
@@ -130,12 +181,12 @@ def login(request):
         
         # Set HTTP-only cookie
         response.set_cookie(
-            'auth-token',
+            AUTH_COOKIE,
             token,
             httponly=True,
             secure=False,  # Allow HTTP in development
             samesite='Strict',
-            max_age=604800,  # 7 days
+            max_age=JWT_TTL_SECONDS,
             path='/'
         )
         
@@ -148,6 +199,7 @@ def login(request):
 
 
 @api_view(['POST'])
+@authentication_classes([])
 @permission_classes([AllowAny])
 def signup(request):
     """User signup endpoint"""
@@ -161,32 +213,19 @@ def signup(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    if User.objects.filter(email=email).exists():
-        return Response(
-            {'error': 'User with this email already exists'},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-
     try:
-        # Since USERNAME_FIELD is 'email', we pass email as username
-        user = User.objects.create_user(
-            email=email,  # This becomes the username since USERNAME_FIELD='email'
-            password=password,
-            name=name
-        )
+        # The unique email constraints catch duplicates, so there's no
+        # separate exists() check to race against
+        with transaction.atomic():
+            # Since USERNAME_FIELD is 'email', we pass email as username
+            user = User.objects.create_user(
+                email=email,  # This becomes the username since USERNAME_FIELD='email'
+                password=password,
+                name=name
+            )
         
         # Create JWT token
-        secret = os.environ.get('NEXTAUTH_SECRET') or os.environ.get('SECRET_KEY') or 'django-insecure-change-me-in-production'
-        token = jwt.encode(
-            {
-                'userId': user.id,
-                'email': user.email,
-                'name': user.name or '',
-                'exp': int((datetime.utcnow() + timedelta(days=7)).timestamp())
-            },
-            secret,
-            algorithm='HS256'
-        )
+        token = _encode_token(user)
 
         response = Response({
             'success': True,
@@ -199,16 +238,21 @@ def signup(request):
         
         # Set HTTP-only cookie
         response.set_cookie(
-            'auth-token',
+            AUTH_COOKIE,
             token,
             httponly=True,
             secure=False,  # Allow HTTP in development
             samesite='Strict',
-            max_age=604800,
+            max_age=JWT_TTL_SECONDS,
             path='/'
         )
         
         return response
+    except IntegrityError:
+        return Response(
+            {'error': 'User with this email already exists'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     except Exception as e:
         return Response(
             {'error': str(e)},
@@ -220,107 +264,83 @@ def signup(request):
 @permission_classes([AllowAny])
 def get_current_user(request):
     """Get current user from JWT token"""
-    token = request.COOKIES.get('auth-token')
-    
-    if not token:
+    if not request.user.is_authenticated:
+        # JWTCookieAuthentication leaves bad tokens anonymous; tell the two apart
+        error = 'Invalid token' if AUTH_COOKIE in request.COOKIES else 'Not authenticated'
         return Response(
-            {'success': False, 'error': 'Not authenticated'},
+            {'success': False, 'error': error},
             status=status.HTTP_401_UNAUTHORIZED
         )
 
-    try:
-        secret = os.environ.get('NEXTAUTH_SECRET') or os.environ.get('SECRET_KEY') or 'django-insecure-change-me-in-production'
-        decoded = jwt.decode(token, secret, algorithms=['HS256'])
-        user = User.objects.get(id=decoded['userId'])
-        
-        return Response({
-            'success': True,
-            'user': {
-                'id': user.id,
-                'email': user.email,
-                'name': user.name
-            }
-        })
-    except (jwt.InvalidTokenError, User.DoesNotExist):
-        return Response(
-            {'success': False, 'error': 'Invalid token'},
-            status=status.HTTP_401_UNAUTHORIZED
-        )
+    user = request.user
+    return Response({
+        'success': True,
+        'user': {
+            'id': user.id,
+            'email': user.email,
+            'name': user.name
+        }
+    })
 
 
 @api_view(['POST'])
+@authentication_classes([])
 @permission_classes([AllowAny])
 def logout(request):
     """User logout endpoint"""
     response = Response({'success': True})
-    response.delete_cookie('auth-token')
+    response.delete_cookie(AUTH_COOKIE)
     return response
 
 
 class SongViewSet(viewsets.ModelViewSet):
     """Song viewset"""
     serializer_class = SongSerializer
-    permission_classes = [AllowAny]  # Will check auth in methods
+    # Anyone may read (public songs), writes need a logged-in user
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    # Opt-in via ?limit=&offset=; without them list() returns a plain array,
+    # which is what the frontend expects
+    pagination_class = LimitOffsetPagination
 
     def get_queryset(self):
-        user = self.get_user_from_token()
+        user = self.request.user
         
-        if user:
-            # Return user's songs
-            return Song.objects.filter(user=user)
+        if user.is_authenticated:
+            # Return user's songs, joining the author for author_name
+            return (
+                Song.objects.filter(user=user)
+                .select_related('user')
+                .only(*SONG_FIELDS)
+            )
         else:
             # Return empty queryset for non-authenticated users
             return Song.objects.none()
 
-    def get_user_from_token(self):
-        """Helper to get user from JWT token"""
-        token = self.request.COOKIES.get('auth-token')
-        if not token:
-            return None
-
-        try:
-            secret = os.environ.get('NEXTAUTH_SECRET') or os.environ.get('SECRET_KEY') or 'django-insecure-change-me-in-production'
-            decoded = jwt.decode(token, secret, algorithms=['HS256'])
-            return User.objects.get(id=decoded['userId'])
-        except (jwt.InvalidTokenError, User.DoesNotExist):
-            return None
-
     def list(self, request):
         """List songs - user's songs if authenticated, empty if not"""
-        user = self.get_user_from_token()
-        
-        if user:
-            songs = Song.objects.filter(user=user)
-        else:
-            songs = Song.objects.none()
-        
+        songs = self.get_queryset()
+        page = self.paginate_queryset(songs)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
         serializer = self.get_serializer(songs, many=True)
         return Response(serializer.data)
 
     def create(self, request):
         """Create a new song"""
-        user = self.get_user_from_token()
-        
-        if not user:
-            return Response(
-                {'error': 'Authentication required'},
-                status=status.HTTP_401_UNAUTHORIZED
-            )
-
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save(user=user)
+        serializer.save(user=request.user)
         
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def retrieve(self, request, pk=None):
         """Get a specific song"""
-        user = self.get_user_from_token()
-        
         try:
-            song = Song.objects.get(pk=pk)
+            song = Song.objects.select_related('user').only(*SONG_FIELDS).get(pk=pk)
             # Only allow if user owns it or it's public
-            if song.user != user and not song.is_public:
+            if song.user_id != request.user.id and not song.is_public:
                 return Response(
                     {'error': 'Not found'},
                     status=status.HTTP_404_NOT_FOUND
@@ -2,25 +2,41 @@
 Django settings for argyle project.
 """
 import os
+import queue
+import sys
 from pathlib import Path
-from dotenv import load_dotenv
 
-load_dotenv()
+# Load a local .env file. Set ARGYLE_SKIP_DOTENV=1 where the environment is
+# already provided (e.g. Heroku) to skip the import and the file search.
+if not os.environ.get('ARGYLE_SKIP_DOTENV'):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+# All environment lookups below go through _ENV, so there's one place to patch
+_ENV = os.environ
+
+
+def _getbool(key, default='False'):
+    return _ENV.get(key, default).lower() == 'true'
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
+# Plain-string form for the path settings below; Django joins onto these
+# with os.path on every template/static lookup
+_BASE = str(BASE_DIR)
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = os.environ.get('SECRET_KEY', 'django-insecure-change-me-in-production')
+SECRET_KEY = _ENV.get('SECRET_KEY', 'django-insecure-change-me-in-production')
 
 # SECURITY WARNING: don't run with debug turned on in production!
 # Default to True for local development, False for production
-DEBUG = os.environ.get('DEBUG', 'True').lower() == 'true'
+DEBUG = _getbool('DEBUG', 'True')
 
-ALLOWED_HOSTS = os.environ.get('ALLOWED_HOSTS', '').split(',') if os.environ.get('ALLOWED_HOSTS') else ['localhost', '127.0.0.1']
+_allowed_hosts = _ENV.get('ALLOWED_HOSTS')
+ALLOWED_HOSTS = _allowed_hosts.split(',') if _allowed_hosts else ['localhost', '127.0.0.1']
 
 # Application definition
-INSTALLED_APPS = [
+INSTALLED_APPS = (
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -38,7 +54,7 @@ INSTALLED_APPS = [
     # our apps
     'accounts',
     'api',
-]
+)
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
@@ -47,7 +63,6 @@ MIDDLEWARE = [
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',  # Required for admin and django-allauth
-    'api.middleware.DisableCSRFForAPI',  # Exempt API endpoints from CSRF
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -59,7 +74,7 @@ ROOT_URLCONF = 'argyle.urls'
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [BASE_DIR / 'templates'],
+        'DIRS': [os.path.join(_BASE, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -76,27 +91,38 @@ WSGI_APPLICATION = 'argyle.wsgi.application'
 
 # Database
 # Use STORAGE_URL if provided (for Neon/Heroku Postgres connection strings)
-if os.environ.get('STORAGE_URL'):
+_storage_url = _ENV.get('STORAGE_URL')
+if _storage_url:
     import dj_database_url
     DATABASES = {
         'default': dj_database_url.config(
-            default=os.environ.get('STORAGE_URL'),
+            default=_storage_url,
             conn_max_age=600,
             conn_health_checks=True,
         )
     }
-elif os.environ.get('DB_NAME'):
+elif _ENV.get('DB_NAME'):
     # Use individual database settings if provided
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.postgresql',
-            'NAME': os.environ.get('DB_NAME', ''),
-            'USER': os.environ.get('DB_USER', ''),
-            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
-            'HOST': os.environ.get('DB_HOST', ''),
-            'PORT': os.environ.get('DB_PORT', '5432'),
+            # Overridable so a pooling backend can be dropped in
+            'ENGINE': _ENV.get('DB_ENGINE', 'django.db.backends.postgresql'),
+            'NAME': _ENV.get('DB_NAME', ''),
+            'USER': _ENV.get('DB_USER', ''),
+            'PASSWORD': _ENV.get('DB_PASSWORD', ''),
+            'HOST': _ENV.get('DB_HOST', ''),
+            'PORT': _ENV.get('DB_PORT', '5432'),
+            # Reuse connections across requests, as the STORAGE_URL branch does
+            'CONN_MAX_AGE': int(_ENV.get('CONN_MAX_AGE', '600')),
+            'CONN_HEALTH_CHECKS': True,
             'OPTIONS': {
                 'sslmode': 'require',
+                # TCP keepalives so idle persistent connections aren't
+                # silently dropped by load balancers
+                'keepalives': 1,
+                'keepalives_idle': 30,
+                'keepalives_interval': 10,
+                'keepalives_count': 5,
             },
         }
     }
@@ -105,32 +131,43 @@ else:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / 'db.sqlite3',
+            'NAME': os.path.join(_BASE, 'db.sqlite3'),
         }
     }
 
+# pgbouncer in transaction mode hands each transaction a different server
+# connection, so named (server-side) cursors from .iterator() would be lost
+if _ENV.get('PGBOUNCER_MODE') == 'transaction':
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# Pinned off: wrapping every request (health checks, the SPA shell) in
+# BEGIN/COMMIT costs extra round-trips. Views that make several related
+# writes wrap them in transaction.atomic themselves, as signup does.
+DATABASES['default']['ATOMIC_REQUESTS'] = False
+
 # Custom User Model
 AUTH_USER_MODEL = 'api.User'
 
 # django-allauth Configuration
-SITE_ID = int(os.environ.get('SITE_ID', '1'))
+SITE_ID = int(_ENV.get('SITE_ID', '1'))
 
 # Authentication backends
+# EmailBackend subclasses ModelBackend, so it also provides model perms; listing
+# ModelBackend separately would only add another password hash per failed login
 AUTHENTICATION_BACKENDS = [
     'accounts.backends.EmailBackend',  # Custom email-based authentication (for admin)
-    'django.contrib.auth.backends.ModelBackend',  # Django model perms (fallback)
     'allauth.account.auth_backends.AuthenticationBackend',  # allauth login (for regular login)
 ]
 
 # Allauth settings
-ACCOUNT_LOGIN_METHODS = {"email"}  # Email-only login
-ACCOUNT_SIGNUP_FIELDS = [
+ACCOUNT_LOGIN_METHODS = frozenset({"email"})  # Email-only login
+ACCOUNT_SIGNUP_FIELDS = (
     "first_name*",
     "last_name*",
     "email*",
     "password1*",
     "password2*",
-]  # Require first and last name at signup
+)  # Require first and last name at signup
 
 # Tell allauth to use our custom signup form
 ACCOUNT_FORMS = {
@@ -154,17 +191,19 @@ ACCOUNT_SIGNUP_REDIRECT_URL = "/accounts/signup/pending/"
 ACCOUNT_LOGOUT_REDIRECT_URL = "/accounts/login/"
 
 # Email settings (for password reset, email confirmation)
-# Console by default; can switch to SMTP or other backends
-_brevo_smtp_key = os.environ.get('BREVO_SMTP_KEY')
-_brevo_smtp_login = os.environ.get('BREVO_SMTP_LOGIN')
-_brevo_api_key = os.environ.get('BREVO_API_KEY')
-_force_console = os.environ.get('FORCE_CONSOLE_EMAIL', 'False').lower() == 'true'
+# Console by default; can switch to SMTP or other backends.
+# Real delivery goes through ThreadedEmailBackend so views don't block on send.
+_brevo_smtp_key = _ENV.get('BREVO_SMTP_KEY')
+_brevo_smtp_login = _ENV.get('BREVO_SMTP_LOGIN')
+_brevo_api_key = _ENV.get('BREVO_API_KEY')
+_force_console = _getbool('FORCE_CONSOLE_EMAIL')
 
 if _brevo_api_key and not _force_console:
     try:
         import anymail
-        INSTALLED_APPS.append('anymail')
-        EMAIL_BACKEND = 'anymail.backends.brevo.EmailBackend'
+        INSTALLED_APPS += ('anymail',)
+        EMAIL_BACKEND = 'accounts.mail.ThreadedEmailBackend'
+        THREADED_EMAIL_BACKEND = 'anymail.backends.brevo.EmailBackend'
         ANYMAIL = {
             'BREVO_API_KEY': _brevo_api_key,
         }
@@ -174,11 +213,12 @@ if _brevo_api_key and not _force_console:
         EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
         DEFAULT_FROM_EMAIL = "Argyle <noreply@localhost>"
 elif _brevo_smtp_key and not _force_console:
-    EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    EMAIL_BACKEND = 'accounts.mail.ThreadedEmailBackend'
+    THREADED_EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
     EMAIL_HOST = 'smtp-relay.brevo.com'
     EMAIL_PORT = 587
     EMAIL_USE_TLS = True
-    EMAIL_HOST_USER = _brevo_smtp_login or os.environ.get('BREVO_SMTP_USER', '')
+    EMAIL_HOST_USER = _brevo_smtp_login or _ENV.get('BREVO_SMTP_USER', '')
     EMAIL_HOST_PASSWORD = _brevo_smtp_key
     DEFAULT_FROM_EMAIL = "Argyle <no-reply@argyletheory.com>"
 else:
@@ -186,7 +226,7 @@ else:
     DEFAULT_FROM_EMAIL = "Argyle <noreply@localhost>"
 
 SERVER_EMAIL = DEFAULT_FROM_EMAIL
-EMAIL_SUBJECT_PREFIX = os.environ.get('EMAIL_SUBJECT_PREFIX', '[Argyle] ')
+EMAIL_SUBJECT_PREFIX = _ENV.get('EMAIL_SUBJECT_PREFIX', '[Argyle] ')
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -212,71 +252,132 @@ USE_TZ = True
 
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = '/static/'
-STATIC_ROOT = BASE_DIR / 'staticfiles'
-STATICFILES_DIRS = [BASE_DIR / 'static']
+STATIC_ROOT = os.path.join(_BASE, 'staticfiles')
+STATICFILES_DIRS = [os.path.join(_BASE, 'static')]
 
 # Media files (user uploads)
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
-
-# WhiteNoise for static files
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+MEDIA_ROOT = os.path.join(_BASE, 'media')
+
+# WhiteNoise for static files. Django 5.1+ only reads STORAGES (the old
+# STATICFILES_STORAGE setting is ignored). collectstatic writes hashed
+# files plus .gz and, with Brotli installed, .br variants.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Logging configuration
+# Log records are handed to a queue and written to stderr by a listener
+# thread (started in AccountsConfig.ready), so requests never block on I/O
+_LOG_QUEUE = queue.Queue()
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'handlers': {
         'console': {
-            'class': 'logging.StreamHandler',
+            'class': 'logging.handlers.QueueHandler',
+            'queue': _LOG_QUEUE,
         },
     },
     'loggers': {
         'accounts.backends': {
             'handlers': ['console'],
-            'level': 'INFO',
+            'level': _ENV.get('ACCOUNTS_LOG_LEVEL', 'WARNING'),
         },
     },
 }
 
+# Cache: Redis when REDIS_URL is set, otherwise per-process memory.
+# SHARED_CACHE tells code whether a cache.delete() reaches every worker; data
+# that must be invalidated across workers is only cached when it does.
+_redis_url = _ENV.get('REDIS_URL')
+SHARED_CACHE = bool(_redis_url)
+if _redis_url:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': _redis_url,
+        }
+    }
+    # Sessions (admin and allauth forms) are read from Redis and only fall
+    # back to the django_session table on a miss; writes still go to both.
+    # Not on LocMem: a session changed or flushed in one worker would stay
+    # cached in the others.
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Site-wide page cache in production (not in DEBUG or test runs).
+# API responses and any page that reads the session are per-user, so
+# NeverCachePrivate keeps them out of it.
+CACHE_MIDDLEWARE_SECONDS = 600
+CACHE_MIDDLEWARE_KEY_PREFIX = 'argyle'
+if not DEBUG and 'test' not in sys.argv:
+    MIDDLEWARE = [
+        'django.middleware.cache.UpdateCacheMiddleware',
+        'api.middleware.NeverCachePrivate',
+        *MIDDLEWARE,
+        'django.middleware.cache.FetchFromCacheMiddleware',
+    ]
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
-    # Don't use SessionAuthentication for API - it requires CSRF
-    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    # Don't use SessionAuthentication for API - it requires CSRF.
+    # The frontend authenticates with the JWT auth-token cookie instead.
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'api.authentication.JWTCookieAuthentication',
+    ],
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
     ],
 }
 
 # CORS settings
-CORS_ALLOWED_ORIGINS = [
+CORS_ALLOWED_ORIGINS = (
     "http://localhost:3000",
     "http://localhost:8000",
     "https://argyletheory.com",
-]
+)
 
 CORS_ALLOW_CREDENTIALS = True
 
 # CSRF settings - exempt API endpoints
-CSRF_TRUSTED_ORIGINS = [
+CSRF_TRUSTED_ORIGINS = (
     "http://localhost:8000",
     "http://127.0.0.1:8000",
-]
+)
 
 # Security settings for production
 if not DEBUG:
-    SECURE_SSL_REDIRECT = os.environ.get('SECURE_SSL_REDIRECT', 'False') == 'True'
+    SECURE_SSL_REDIRECT = _ENV.get('SECURE_SSL_REDIRECT', 'False') == 'True'
     SESSION_COOKIE_SECURE = True
     CSRF_COOKIE_SECURE = True
     SECURE_BROWSER_XSS_FILTER = True
     SECURE_CONTENT_TYPE_NOSNIFF = True
+    # WhiteNoise serves from collectstatic output only. Its default max-age
+    # is kept: hashed files are already marked immutable, while the ES modules
+    # script.js imports by unhashed name must be picked up soon after a deploy.
+    WHITENOISE_USE_FINDERS = False
 else:
     # In development, allow HTTP cookies
     SESSION_COOKIE_SECURE = False
     CSRF_COOKIE_SECURE = False
+    # WhiteNoise serves straight from the app/static dirs and picks up edits,
+    # so urls.py doesn't need static() patterns
+    WHITENOISE_USE_FINDERS = True
+    WHITENOISE_AUTOREFRESH = True